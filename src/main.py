@@ -1,15 +1,20 @@
 from fasthtml.common import *
 from rich.console import Console
-from rich import print
-from rich.traceback import install
 import sqlite3
+import queue
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
 from pathlib import Path
-from pydantic import BaseModel, Field, field_validator
-from typing import Optional, Dict, List
+from pydantic import BaseModel, Field, ValidationError
+from typing import Optional, Dict, List, Callable
 import json
+import csv
+from html import escape
+from bisect import insort
+from itertools import groupby
+from operator import itemgetter
 
-# Enable Rich traceback for debugging
-install()
 console = Console()
 
 # Paths configuration
@@ -18,6 +23,7 @@ BASE_PATH = SCRIPT_PATH.parent.parent
 DATA_PATH = BASE_PATH / 'data'
 STATIC_PATH = SCRIPT_PATH.parent / 'static'
 DATABASE = DATA_PATH / 'shopping_list.db'
+POOL_SIZE = 4
 
 # Create custom stylesheet link for our CSS
 custom_styles = Link(
@@ -34,37 +40,135 @@ app = FastHTML(hdrs=(picolink, custom_styles))
 def static_files(path: str):
     """Serve static files from the static directory."""
     return FileResponse(STATIC_PATH / path)
+
+# Largest money amount and quantity accepted from users. Together they
+# keep cents, and cost times quantity, inside SQLite's 64-bit INTEGER.
+MAX_CENTS = 100_000_000_000  # $1,000,000,000.00
+MAX_QUANTITY = 1_000_000
+
+def to_cents(amount: float) -> int:
+    """Convert a dollar amount to integer cents, e.g. 12.5 -> 1250.
+
+    Raises ValueError for amounts that are not finite or exceed MAX_CENTS.
+    """
+    if not abs(amount) * 100 <= MAX_CENTS:
+        raise ValueError(f"Amount out of range: {amount!r}")
+    return int(round(amount * 100))
+
 class ShoppingItem(BaseModel):
     id: Optional[int] = None
     category: str
     item: str
-    quantity: int = Field(ge=0)
-    cost: float = Field(ge=0)
+    quantity: int = Field(ge=0, le=MAX_QUANTITY)
+    cost: float = Field(ge=0, le=MAX_CENTS / 100, allow_inf_nan=False)
     notes: Optional[str] = None
     found: bool = False
     store: str
 
-    @field_validator('cost')
-    @classmethod
-    def validate_cost(cls, v: float) -> float:
-        return round(float(v), 2)
+    @property
+    def cost_cents(self) -> int:
+        return to_cents(self.cost)
 
 class BudgetUpdate(BaseModel):
-    amount: float = Field(ge=0)
+    amount: float = Field(ge=0, le=MAX_CENTS / 100, allow_inf_nan=False)
+
+    @property
+    def amount_cents(self) -> int:
+        return to_cents(self.amount)
 
-    @field_validator('amount')
-    @classmethod
-    def validate_amount(cls, v: float) -> float:
-        return round(float(v), 2)
+def format_cents(cents: int) -> str:
+    """Format integer cents as a plain amount, e.g. 1250 -> '12.50'."""
+    sign = "-" if cents < 0 else ""
+    whole, frac = divmod(abs(cents), 100)
+    return f"{sign}{whole}.{frac:02d}"
+
+def fmt(cents: int) -> str:
+    """Format integer cents as dollars, e.g. 1250 -> '$12.50'."""
+    return f"${format_cents(cents)}"
+
+def _parse_money(s: str) -> int:
+    """Parse a dollar amount such as '$12.5' into integer cents.
+
+    Raises ValueError unless the text is digits with at most two decimals,
+    optionally prefixed by '$' and/or '-', and the amount is within
+    MAX_CENTS.
+    """
+    amount = s.strip().lstrip("$")
+    sign = -1 if amount.startswith("-") else 1
+    whole, _, frac = amount.removeprefix("-").partition(".")
+    if not (whole or frac) or len(frac) > 2 or not (whole + frac).isdigit():
+        raise ValueError(f"Invalid amount: {s!r}")
+    cents = int(whole or "0") * 100 + int((frac + "00")[:2])
+    if cents > MAX_CENTS:
+        raise ValueError(f"Amount out of range: {s!r}")
+    return sign * cents
 class DatabaseError(Exception):
     """Custom exception for database operations."""
     pass
 
+# Applied to every connection: WAL lets readers proceed alongside the
+# writer and needs one fsync per commit under synchronous=NORMAL, while
+# memory-mapped I/O avoids read() syscalls when the list is scanned.
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=134217728",
+)
+
+# SQL used while serving requests. Keeping each statement a constant
+# string lets sqlite3's per-connection statement cache reuse the
+# prepared statement instead of compiling it again.
+SQL_GET_BUDGET = "SELECT amount_cents FROM budget WHERE id = 1"
+SQL_SET_BUDGET = "UPDATE budget SET amount_cents = ? WHERE id = 1"
+SQL_LIST_ITEMS = """
+    SELECT id, category, item, quantity, cost_cents, notes, found, store
+    FROM shopping_list
+    ORDER BY category ASC, found ASC, id DESC
+"""
+SQL_INSERT_ITEM = """
+    INSERT INTO shopping_list
+    (category, item, quantity, cost_cents, notes, store)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+SQL_TOGGLE_FOUND = "UPDATE shopping_list SET found = NOT found WHERE id = ? RETURNING *"
+SQL_DELETE_ITEM = "DELETE FROM shopping_list WHERE id = ? RETURNING *"
+
+# Per-column statements for inline editing through /edit and /update.
+# The keys double as the whitelist of editable fields.
+SQL_SELECT_FIELD = {
+    "category": "SELECT category FROM shopping_list WHERE id = ?",
+    "item": "SELECT item FROM shopping_list WHERE id = ?",
+    "quantity": "SELECT quantity FROM shopping_list WHERE id = ?",
+    "cost": "SELECT cost_cents FROM shopping_list WHERE id = ?",
+    "notes": "SELECT notes FROM shopping_list WHERE id = ?",
+    "store": "SELECT store FROM shopping_list WHERE id = ?",
+}
+SQL_UPDATE_FIELD = {
+    "category": "UPDATE shopping_list SET category = ? WHERE id = ? RETURNING *",
+    "item": "UPDATE shopping_list SET item = ? WHERE id = ? RETURNING *",
+    "quantity": "UPDATE shopping_list SET quantity = ? WHERE id = ? RETURNING *",
+    "cost": "UPDATE shopping_list SET cost_cents = ? WHERE id = ? RETURNING *",
+    "notes": "UPDATE shopping_list SET notes = ? WHERE id = ? RETURNING *",
+    "store": "UPDATE shopping_list SET store = ? WHERE id = ? RETURNING *",
+}
+
+def open_connection(database: Path = DATABASE, **kwargs) -> sqlite3.Connection:
+    """Open an autocommit connection with SQLITE_PRAGMAS applied."""
+    conn = sqlite3.connect(database, isolation_level=None, cached_statements=256, **kwargs)
+    for pragma in SQLITE_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
 def setup_database():
     """Initialize database with improved schema."""
     try:
-        conn = sqlite3.connect(DATABASE)
+        conn = open_connection()
         c = conn.cursor()
+
+        # Rebuild the schema and seed the budget in a single transaction
+        c.execute("BEGIN IMMEDIATE")
         
         # Drop existing tables to ensure clean slate
         c.execute("DROP TABLE IF EXISTS shopping_list")
@@ -76,82 +180,317 @@ def setup_database():
             category TEXT NOT NULL,
             item TEXT NOT NULL,
             quantity INTEGER NOT NULL CHECK (quantity >= 0),
-            cost REAL NOT NULL CHECK (cost >= 0),
+            cost_cents INTEGER NOT NULL CHECK (cost_cents >= 0),
             notes TEXT,
             found INTEGER DEFAULT 0,
             store TEXT NOT NULL
         )""")
 
+        # Single-row table: the budget is updated in place
         c.execute("""CREATE TABLE budget (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            amount REAL NOT NULL CHECK (amount >= 0)
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            amount_cents INTEGER NOT NULL CHECK (amount_cents >= 0)
         )""")
 
-        # Create indices for better query performance
-        c.execute("CREATE INDEX IF NOT EXISTS idx_category ON shopping_list(category)")
-        c.execute("CREATE INDEX IF NOT EXISTS idx_found ON shopping_list(found)")
+        # Index matching the list query's ORDER BY so it needs no sort step
+        c.execute("CREATE INDEX IF NOT EXISTS idx_list_sort ON shopping_list(category, found, id DESC)")
         
         # Set initial budget
-        c.execute("INSERT INTO budget (amount) VALUES (?)", (1000.00,))
+        c.execute("INSERT OR REPLACE INTO budget (id, amount_cents) VALUES (1, ?)", (100000,))
 
-        conn.commit()
+        c.execute("COMMIT")
         conn.close()
+        invalidate_shopping_list()
+        invalidate_budget()
         console.log("Database setup successful", style="bold green")
     except sqlite3.Error as e:
         console.log(f"Database error: {e}", style="bold red")
         raise DatabaseError(f"Failed to setup database: {e}")
 
+class ConnectionPool:
+    """Fixed-size pool of SQLite connections shared across requests.
+
+    Connections are opened lazily (up to ``size``) via ``open_connection``, so
+    every request reuses an open file handle and a warm page cache instead
+    of paying for ``sqlite3.connect`` each time.
+    """
+
+    def __init__(self, database: Path, size: int = POOL_SIZE):
+        self.database = database
+        self.size = size
+        self._idle: queue.Queue = queue.Queue(maxsize=size)
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = open_connection(self.database, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        """Take an idle connection, opening a new one while below ``size``."""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._opened < self.size:
+                self._opened += 1
+                try:
+                    return self._connect()
+                except sqlite3.Error:
+                    self._opened -= 1
+                    raise
+        return self._idle.get()
+
+    def release(self, conn: sqlite3.Connection):
+        """Return a connection to the pool, rolling back any open transaction."""
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+class SQLiteWriter:
+    """Background thread that owns the only write connection.
+
+    SQLite allows a single writer, so request threads queue their writes
+    here instead of contending for the lock. Writes that are queued while
+    a commit is in progress are grouped into the next transaction, each
+    inside its own savepoint so one failing statement does not undo the
+    others. The thread is started on the first submitted write, and again
+    if it has died.
+    """
+
+    def __init__(self, database: Path):
+        self.database = database
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, sql: str, params=(), many: bool = False,
+               on_commit: Optional[Callable[[list], None]] = None) -> Future:
+        """Queue a write; the future resolves to the rows it returned once committed.
+
+        With ``many=True`` the statement is run through ``executemany`` and
+        the future resolves to an empty list. ``on_commit`` is called with
+        the rows on the writer thread, in commit order, before the future
+        resolves.
+        """
+        future: Future = Future()
+        self._queue.put((sql, params, many, on_commit, future))
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+                self._thread.start()
+        return future
+
+    def _run(self):
+        conn = None
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            batch = [job for job in batch if job[-1].set_running_or_notify_cancel()]
+            try:
+                if conn is None:
+                    conn = open_connection(self.database)
+                    conn.row_factory = sqlite3.Row
+                self._commit(conn, batch)
+            except Exception as e:
+                # The connection could not be opened or rolled back: fail
+                # what is left of the batch and reconnect for the next one
+                console.log(f"SQLite writer error: {e}", style="bold red")
+                for *_, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                if conn is not None:
+                    conn.close()
+                    conn = None
+
+    def _commit(self, conn: sqlite3.Connection, batch: list):
+        done = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for sql, params, many, on_commit, future in batch:
+                conn.execute("SAVEPOINT write")
+                try:
+                    if many:
+                        conn.executemany(sql, params)
+                        rows = []
+                    else:
+                        rows = conn.execute(sql, params).fetchall()
+                except Exception as e:
+                    conn.execute("ROLLBACK TO write")
+                    future.set_exception(e)
+                else:
+                    done.append((future, rows, on_commit))
+                conn.execute("RELEASE write")
+            conn.execute("COMMIT")
+        except Exception as e:
+            if conn.in_transaction:
+                conn.rollback()
+            for *_, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for future, rows, on_commit in done:
+            try:
+                if on_commit is not None:
+                    on_commit(rows)
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result(rows)
+
+pool = ConnectionPool(DATABASE)
+writer = SQLiteWriter(DATABASE)
+
+@contextmanager
 def get_db_connection():
-    """Get database connection with row factory."""
-    conn = sqlite3.connect(DATABASE)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Borrow a pooled database connection with row factory for reads.
 
-def get_budget() -> float:
-    """Get current budget amount."""
+    Writes go through ``submit_write`` instead.
+    """
+    conn = pool.acquire()
     try:
-        with get_db_connection() as conn:
-            result = conn.execute(
-                "SELECT amount FROM budget ORDER BY id DESC LIMIT 1"
-            ).fetchone()
-            return float(result['amount']) if result else 0.0
-    except sqlite3.Error as e:
-        console.log(f"Error getting budget: {e}", style="bold red")
-        return 0.0
+        yield conn
+    finally:
+        pool.release(conn)
 
-def get_total_cost() -> float:
-    """Calculate total cost of all items."""
-    try:
-        with get_db_connection() as conn:
-            result = conn.execute(
-                "SELECT SUM(cost * quantity) as total FROM shopping_list"
-            ).fetchone()
-            return float(result['total']) if result['total'] else 0.0
-    except sqlite3.Error as e:
-        console.log(f"Error calculating total cost: {e}", style="bold red")
-        return 0.0
+def submit_write(sql: str, params=(), many: bool = False,
+                 on_commit: Optional[Callable[[list], None]] = None) -> Future:
+    """Queue a write on the background writer thread."""
+    return writer.submit(sql, params, many, on_commit)
 
-def fetch_shopping_list() -> Dict[str, List[dict]]:
-    """Fetch items sorted by found status and grouped by category."""
+# Read-through cache for the data every page render needs. Readers reuse
+# the cached snapshot while its versions match; writers bump the list or
+# budget version after committing so the next read goes back to SQLite.
+_CACHE_LOCK = threading.Lock()
+_LIST_VERSION = 0
+_BUDGET_VERSION = 0
+_PAGE_CACHE: Optional[tuple[tuple[int, int], tuple[int, int, Dict[str, List[sqlite3.Row]]]]] = None
+
+def invalidate_shopping_list():
+    """Mark cached shopping list data (items and total cost) as stale."""
+    global _LIST_VERSION
+    with _CACHE_LOCK:
+        _LIST_VERSION += 1
+
+def invalidate_budget():
+    """Mark the cached budget as stale."""
+    global _BUDGET_VERSION
+    with _CACHE_LOCK:
+        _BUDGET_VERSION += 1
+
+def fetch_page_state() -> tuple[int, int, Dict[str, List[sqlite3.Row]]]:
+    """Fetch budget, total cost (in cents) and categorized items in one read transaction.
+
+    The returned mapping is shared between requests and must not be mutated.
+    """
+    global _PAGE_CACHE
+    with _CACHE_LOCK:
+        version, cached = (_LIST_VERSION, _BUDGET_VERSION), _PAGE_CACHE
+    if cached and cached[0] == version:
+        return cached[1]
     try:
         with get_db_connection() as conn:
-            cursor = conn.execute("""
-                SELECT * FROM shopping_list 
-                ORDER BY found ASC, category ASC, id DESC
-            """)
-            items = [dict(row) for row in cursor.fetchall()]
-            
-            # Group items by category
+            conn.execute("BEGIN")
+            result = conn.execute(SQL_GET_BUDGET).fetchone()
+            budget = result['amount_cents'] if result else 0
+            total_cost = 0
             categories = {}
-            for item in items:
-                if item['category'] not in categories:
-                    categories[item['category']] = []
-                categories[item['category']].append(item)
-            
-            return categories
+            # Rows arrive sorted by category, so each group is contiguous.
+            # sqlite3.Row already supports item['field'] access, so rows
+            # are kept as-is rather than copied into dicts.
+            for category, group in groupby(conn.execute(SQL_LIST_ITEMS), key=itemgetter('category')):
+                categories[category] = items = list(group)
+                total_cost += sum(map(_line_total, items))
+            conn.execute("COMMIT")
     except sqlite3.Error as e:
-        console.log(f"Error fetching shopping list: {e}", style="bold red")
-        return {}
+        console.log(f"Error fetching page state: {e}", style="bold red")
+        return 0, 0, {}
+    state = (budget, total_cost, categories)
+    with _CACHE_LOCK:
+        if (_LIST_VERSION, _BUDGET_VERSION) == version:
+            _PAGE_CACHE = (version, state)
+    return state
+
+def get_budget() -> int:
+    """Get current budget amount in cents."""
+    return fetch_page_state()[0]
+
+def get_total_cost() -> int:
+    """Calculate total cost of all items in cents."""
+    return fetch_page_state()[1]
+
+def fetch_shopping_list() -> Dict[str, List[sqlite3.Row]]:
+    """Fetch items sorted by found status and grouped by category."""
+    return fetch_page_state()[2]
+
+def _line_total(item: sqlite3.Row) -> int:
+    """Cost in cents of an item's full quantity."""
+    return item['cost_cents'] * item['quantity']
+
+def _list_order(item: sqlite3.Row) -> tuple[int, int]:
+    """Sort key matching the list query's order within a category."""
+    return item['found'], -item['id']
+
+def _without_item(categories: Dict[str, List[sqlite3.Row]], item_id: int) -> tuple[Dict[str, List[sqlite3.Row]], int]:
+    """Return a copy of ``categories`` without item ``item_id`` and the total's change."""
+    for category, items in categories.items():
+        for index, item in enumerate(items):
+            if item['id'] == item_id:
+                categories = dict(categories)
+                remaining = items[:index] + items[index + 1:]
+                if remaining:
+                    categories[category] = remaining
+                else:
+                    del categories[category]
+                return categories, -_line_total(item)
+    return categories, 0
+
+def _with_item(categories: Dict[str, List[sqlite3.Row]], item: sqlite3.Row) -> tuple[Dict[str, List[sqlite3.Row]], int]:
+    """Return a copy of ``categories`` with ``item`` inserted or replaced and the total's change."""
+    categories, delta = _without_item(categories, item['id'])
+    categories = dict(categories)
+    category = item['category']
+    items = list(categories.get(category, []))
+    insort(items, item, key=_list_order)
+    categories[category] = items
+    if len(items) == 1:
+        # New category: restore the query's alphabetical category order
+        categories = dict(sorted(categories.items()))
+    return categories, delta + _line_total(item)
+
+def patch_shopping_list(patch: Callable[[Dict[str, List[sqlite3.Row]]], tuple[Dict[str, List[sqlite3.Row]], int]]):
+    """Apply a committed change to the cached list instead of re-fetching it.
+
+    ``patch`` receives the cached categories and returns an updated copy
+    along with the change to the total cost in cents, so the total is kept
+    up to date without re-summing every item. When nothing current is
+    cached this just invalidates the list.
+    """
+    global _LIST_VERSION, _PAGE_CACHE
+    with _CACHE_LOCK:
+        current = _PAGE_CACHE is not None and _PAGE_CACHE[0] == (_LIST_VERSION, _BUDGET_VERSION)
+        _LIST_VERSION += 1
+        if current:
+            budget, total_cost, categories = _PAGE_CACHE[1]
+            categories, delta = patch(categories)
+            total_cost += delta
+            _PAGE_CACHE = ((_LIST_VERSION, _BUDGET_VERSION), (budget, total_cost, categories))
+
+def patch_updated_rows(rows: list):
+    """``on_commit`` hook: replace cached items with rows from ``UPDATE ... RETURNING *``."""
+    for row in rows:
+        patch_shopping_list(lambda categories: _with_item(categories, row))
+
+def patch_removed_rows(rows: list):
+    """``on_commit`` hook: drop cached items deleted with ``DELETE ... RETURNING *``."""
+    for row in rows:
+        patch_shopping_list(lambda categories: _without_item(categories, row['id']))
 
 def add_item(category: str, item: str, quantity: int, cost: float, notes: str, store: str):
     """Add new item with validation."""
@@ -161,13 +500,8 @@ def add_item(category: str, item: str, quantity: int, cost: float, notes: str, s
         if cost < 0:
             return Div("Cost cannot be negative", cls="error-message")
             
-        with get_db_connection() as conn:
-            conn.execute("""
-                INSERT INTO shopping_list 
-                (category, item, quantity, cost, notes, store)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (category, item, quantity, cost, notes, store))
-            conn.commit()
+        submit_write(SQL_INSERT_ITEM, (category, item, quantity, to_cents(cost), notes, store)).result()
+        invalidate_shopping_list()
             
         return ShoppingTable(fetch_shopping_list())
     except sqlite3.Error as e:
@@ -192,44 +526,55 @@ def make_editable_cell(item_id: str|int, value: str, field: str, cls: str = "")
         cls=f"editable-cell {cls}".strip()
     )
 
-def BudgetStatus():
-    """Enhanced budget status component with inline editing."""
-    budget = get_budget()
-    total_cost = get_total_cost()
+def BudgetCard(budget: int, total_cost: int, oob: bool = False) -> Div:
+    """Budget figures with inline editing (amounts in cents).
+
+    With ``oob=True`` the card is marked for an HTMX out-of-band swap so it
+    can ride along with a response targeting something else.
+    """
     remaining = budget - total_cost
     status = "success" if remaining >= 0 else "error"
     
-    return Article(
+    return Div(
+        H3("Budget Status", cls="budget-title"),
         Div(
-            H3("Budget Status", cls="budget-title"),
             Div(
-                Div(
-                    H4("Total Budget", cls="budget-label"),
-                    make_editable_cell("budget", f"${budget:.2f}", "amount", "budget-value"),
-                ),
-                Div(
-                    H4("Total Cost", cls="budget-label"),
-                    P(f"${total_cost:.2f}", cls="budget-value")
-                ),
-                Div(
-                    H4("Remaining", cls="budget-label"),
-                    P(f"${remaining:.2f}", cls=f"budget-value text-{status}")
-                ),
-                cls="budget-grid"
+                H4("Total Budget", cls="budget-label"),
+                make_editable_cell("budget", fmt(budget), "amount", "budget-value"),
             ),
-            id="budget-status",
-            cls="budget-card"
-        )
+            Div(
+                H4("Total Cost", cls="budget-label"),
+                P(fmt(total_cost), cls="budget-value")
+            ),
+            Div(
+                H4("Remaining", cls="budget-label"),
+                P(fmt(remaining), cls=f"budget-value text-{status}")
+            ),
+            cls="budget-grid"
+        ),
+        id="budget-status",
+        cls="budget-card",
+        hx_swap_oob="true" if oob else None
     )
 
-def ShoppingContainer(categories: Dict[str, List[dict]]) -> Div:
+def BudgetStatus(budget: int, total_cost: int):
+    """Enhanced budget status component with inline editing (amounts in cents)."""
+    return Article(BudgetCard(budget, total_cost))
+
+def BudgetCardOOB() -> Div:
+    """Out-of-band budget card reflecting the current snapshot."""
+    budget, total_cost, _ = fetch_page_state()
+    return BudgetCard(budget, total_cost, oob=True)
+
+def ShoppingContainer(categories: Dict[str, List[sqlite3.Row]], oob: bool = False) -> Div:
     """Container for shopping list."""
     return Div(
         Div(  # Wrapper for the table to control margin
             ShoppingTable(categories),
             cls="shopping-table-wrapper"
         ),
-        id="shopping-container"
+        id="shopping-container",
+        hx_swap_oob="true" if oob else None
     )
 def NewItemForm() -> Form:
     """Grid-based form for adding new items with mobile-friendly layout."""
@@ -295,52 +640,56 @@ def NewItemForm() -> Form:
         hx_swap="innerHTML"
     )
 
-def ShoppingTable(categories: Dict[str, List[dict]]) -> Div:
+# Item card markup, formatted once per item by _render_item. This is the
+# per-item hot loop of ShoppingTable, so it fills a single template rather
+# than building FT nodes. Item actions swap nothing themselves: their
+# responses carry out-of-band fragments.
+_ITEM_TMPL = (
+    '<div id="item-{id}" class="item-card {cls}"{swap_oob}>'
+    '<div class="card-header">'
+    '<input type="checkbox"{checked} hx-post="/toggle_found/{id}" hx-swap="none">'
+    '<h4>{item}</h4>'
+    '</div>'
+    '<div class="card-body">'
+    '<p>Quantity: {quantity}</p>'
+    '<p>Cost: {cost}</p>'
+    '<p>Store: {store}</p>'
+    '<p>Notes: {notes}</p>'
+    '<button hx-post="/remove_item/{id}" hx-swap="none" class="button-error mt-2">Remove</button>'
+    '</div>'
+    '</div>'
+)
+
+def _render_item(item: sqlite3.Row, oob: bool = False) -> str:
+    """Render one item card as HTML, escaping user-entered text.
+
+    With ``oob=True`` the card is marked for an HTMX out-of-band swap.
+    """
+    found = item['found']
+    return _ITEM_TMPL.format(
+        id=item['id'],
+        cls=found and "found-item",
+        swap_oob=' hx-swap-oob="true"' if oob else "",
+        checked=" checked" if found else "",
+        item=escape(item['item']),
+        quantity=item['quantity'],
+        cost=fmt(item['cost_cents']),
+        store=escape(item['store']),
+        notes=escape(item['notes'] or "-"),
+    )
+
+def ShoppingTable(categories: Dict[str, List[sqlite3.Row]]) -> Div:
     """Generate responsive shopping table grouped by category."""
     if not categories:
         return Div(P("No items yet!", cls="text-center"), cls="empty-state")
     
+    # Categories and their items are already ordered by the list query
     mobile_cards = []
-    for category, items in sorted(categories.items()):
-        sorted_items = sorted(items, key=lambda x: (x['found'], -x['id']))
-        
-        category_items = []
-        for item in sorted_items:
-            category_items.append(
-                Div(
-                    Div(
-                        Input(
-                            type="checkbox",
-                            checked=bool(item['found']),
-                            hx_post=f"/toggle_found/{item['id']}",
-                            hx_target="#shopping-container",
-                            hx_swap="innerHTML"
-                        ),
-                        H4(item['item']),
-                        cls="card-header"
-                    ),
-                    Div(
-                        P(f"Quantity: {item['quantity']}"),
-                        P(f"Cost: ${item['cost']:.2f}"),
-                        P(f"Store: {item['store']}"),
-                        P(f"Notes: {item['notes'] or '-'}"),
-                        Button(
-                            "Remove",
-                            hx_post=f"/remove_item/{item['id']}",
-                            hx_target="#shopping-container",
-                            hx_swap="innerHTML",
-                            cls="button-error mt-2"
-                        ),
-                        cls="card-body"
-                    ),
-                    cls=f"item-card {item['found'] and 'found-item'}"
-                )
-            )
-        
+    for category, items in categories.items():
         mobile_cards.append(
             Div(
                 H3(category, cls="category-title"),
-                *category_items,
+                NotStr("".join(map(_render_item, items))),
                 cls="category-section"
             )
         )
@@ -356,13 +705,13 @@ add_new_item_button = Button(
 )
 @app.get("/")
 def home():
-    categories = fetch_shopping_list()
+    budget, total_cost, categories = fetch_page_state()
     return (
         Title("House Painting Shopping List"),
         Meta(name="viewport", content="width=device-width, initial-scale=1.0, viewport-fit=cover"),
         Main(
             Div(
-                BudgetStatus(),
+                BudgetStatus(budget, total_cost),
                 add_new_item_button ,
                 ShoppingContainer(categories),
                 Div(cls="spacer", style="height: 1.5rem;"),
@@ -373,9 +722,8 @@ def home():
         )
     )
 
-@app.get("/new_item_form")
-def new_item_form():
-    """Return the form for adding a new item inside a modal."""
+def NewItemModal() -> Div:
+    """Modal wrapping the form for adding a new item."""
     return Div(
         Div(
             Div(
@@ -410,36 +758,105 @@ def new_item_form():
                 hx_swap="innerHTML",
                 _="on submit target.reset() then htmx.ajax('GET', '/close_modal', {target: '#modal'})"
             ),
+            Details(
+                Summary("Paste several items"),
+                Form(
+                    Div(
+                        Textarea(
+                            name="items",
+                            placeholder="One item per line: category,item,quantity,cost,store,notes",
+                            rows="6",
+                            required=True
+                        ),
+                        Button("Add Items", type="submit", cls="button-primary"),
+                        cls="modal-form"
+                    ),
+                    action="/add_items",
+                    method="post",
+                    hx_target="#shopping-container",
+                    hx_swap="innerHTML",
+                    _="on submit target.reset() then htmx.ajax('GET', '/close_modal', {target: '#modal'})"
+                )
+            ),
             cls="modal-content"
         ),
         id="modal",
         cls="modal show"  # Makes the modal visible
     )
+
+def ClosedModal() -> Div:
+    """Empty, hidden modal container."""
+    return Div(id="modal", cls="modal hidden")  # Clear modal content and hide
+
+# The modal markup never changes, so render it once at import time
+_NEW_ITEM_MODAL_HTML = to_xml(NewItemModal())
+_CLOSED_MODAL_HTML = to_xml(ClosedModal())
+
+@app.get("/new_item_form")
+def new_item_form():
+    """Return the form for adding a new item inside a modal."""
+    return HTMLResponse(_NEW_ITEM_MODAL_HTML)
+
 @app.get("/close_modal")
 def close_modal():
     """Close and reset the modal."""
-    return Div(id="modal", cls="modal hidden")  # Clear modal content and hide
+    return HTMLResponse(_CLOSED_MODAL_HTML)
 
-@app.post("/add_item")
-def add_item(item: ShoppingItem):
+def parse_item_lines(text: str) -> List[ShoppingItem]:
+    """Parse pasted CSV lines of ``category,item,quantity,cost,store[,notes]``.
+
+    Raises ValueError naming the first line that cannot be parsed.
+    """
+    items = []
+    for line_no, row in enumerate(csv.reader(text.splitlines()), start=1):
+        if not any(field.strip() for field in row):
+            continue
+        if len(row) not in (5, 6):
+            raise ValueError(f"Line {line_no}: expected category,item,quantity,cost,store[,notes]")
+        category, item, quantity, cost, store, *notes = (field.strip() for field in row)
+        try:
+            items.append(ShoppingItem(
+                category=category, item=item, quantity=quantity,
+                cost=cost.lstrip("$"), store=store, notes=notes[0] if notes else None
+            ))
+        except ValidationError:
+            raise ValueError(f"Line {line_no}: invalid quantity or cost") from None
+    if not items:
+        raise ValueError("No items to add")
+    return items
+
+def insert_items(items: List[ShoppingItem]):
+    """Insert items with one executemany inside a single transaction."""
     try:
-        with get_db_connection() as conn:
-            conn.execute("""
-                INSERT INTO shopping_list 
-                (category, item, quantity, cost, notes, store)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (item.category, item.item, item.quantity, item.cost, 
-                  item.notes, item.store))
-            conn.commit()
+        # The writer runs the whole executemany inside one transaction
+        submit_write(SQL_INSERT_ITEM, [
+            (item.category, item.item, item.quantity, item.cost_cents, item.notes, item.store)
+            for item in items
+        ], many=True).result()
+        invalidate_shopping_list()
         
-        # Return updated shopping list and reset modal
+        # Return updated shopping list, reset modal and refresh totals
         return [
             ShoppingContainer(fetch_shopping_list()),
-            Div(id="modal")  # Reset modal to an empty state
+            Div(id="modal"),  # Reset modal to an empty state
+            BudgetCardOOB()
         ]
     except sqlite3.Error as e:
-        console.log(f"Error adding item: {e}", style="bold red")
+        console.log(f"Error adding items: {e}", style="bold red")
         return Div("Failed to add item", cls="error-message", id="form-errors")
+
+@app.post("/add_item")
+def add_item(item: ShoppingItem):
+    return insert_items([item])
+
+@app.post("/add_items")
+def add_items(items: str):
+    """Add several pasted items in one batch."""
+    try:
+        parsed = parse_item_lines(items)
+    except ValueError as e:
+        return Div(str(e), cls="error-message", id="form-errors")
+    return insert_items(parsed)
 @app.get("/edit/budget/amount")
 def edit_budget_form():
     """Return an inline editable form for the budget."""
@@ -449,7 +866,7 @@ def edit_budget_form():
         Input(
             type="number",
             name="value",
-            value=f"{budget:.2f}",
+            value=format_cents(budget),
             step="0.01",
             min="0",
             cls="edit-input",
@@ -457,37 +874,26 @@ def edit_budget_form():
         ),
         Button("Save", type="submit", cls="button-primary"),
         hx_post="/update/budget/amount",
-        hx_target="#content-container",  # Target the entire content container
-        hx_swap="outerHTML"  # Replace the full container
+        hx_target="#budget-status",  # Target the budget card
+        hx_swap="outerHTML"  # Replace the card, including this form
     )
 
 @app.post("/update/budget/amount")
 def update_budget_inline(value: str):
-    """Update budget with validation and replace the full container."""
+    """Update budget with validation and re-render the budget card."""
     try:
-        # Parse and validate the budget amount
-        budget = float(value.replace("$", "").strip())
+        # Parse and validate the budget amount (stored in cents)
+        budget = _parse_money(value)
         if budget < 0:
             return Div("Budget cannot be negative", cls="error-message")
 
         # Update the budget in the database
-        with get_db_connection() as conn:
-            conn.execute("INSERT INTO budget (amount) VALUES (?)", (budget,))
-            conn.commit()
-
-        # Fetch updated categories for the shopping list
-        categories = fetch_shopping_list()
+        submit_write(SQL_SET_BUDGET, (budget,)).result()
+        invalidate_budget()
 
-        # Return the full updated content: BudgetStatus + ShoppingContainer
-        return Div(
-                BudgetStatus(),
-                add_new_item_button ,
-                ShoppingContainer(categories),
-                Div(cls="spacer", style="height: 1.5rem;"),
-                Div(id="modal"),  # Modal container (empty by default)
-                id="content-container",  # Wrap the full content for updates
-                cls="container"
-            )
+        # Only the budget figures change, so swap just the budget card
+        budget, total_cost, _ = fetch_page_state()
+        return BudgetCard(budget, total_cost)
         
     except ValueError:
         # Handle invalid input
@@ -503,12 +909,13 @@ def update_budget(budget: float):
         if budget < 0:
             return Div("Budget cannot be negative", cls="error-message")
             
-        with get_db_connection() as conn:
-            conn.execute("INSERT INTO budget (amount) VALUES (?)", (budget,))
-            conn.commit()
+        submit_write(SQL_SET_BUDGET, (to_cents(budget),)).result()
+        invalidate_budget()
             
         # Return the full shopping container to update both budget and list
         return ShoppingContainer(fetch_shopping_list())
+    except ValueError:
+        return Div("Invalid budget amount", cls="error-message")
     except sqlite3.Error as e:
         console.log(f"Error updating budget: {e}", style="bold red")
         return Div("Failed to update budget", cls="error-message")
@@ -518,14 +925,10 @@ def update_budget(budget: float):
 def toggle_found(item_id: int):
     """Toggle found status of an item."""
     try:
-        with get_db_connection() as conn:
-            conn.execute(
-                "UPDATE shopping_list SET found = NOT found WHERE id = ?",
-                (item_id,)
-            )
-            conn.commit()
-            
-        return ShoppingContainer(fetch_shopping_list())
+        updated = submit_write(SQL_TOGGLE_FOUND, (item_id,), on_commit=patch_updated_rows).result()
+
+        # Re-render only the toggled card; totals do not depend on found
+        return [NotStr(_render_item(row, oob=True)) for row in updated]
     except sqlite3.Error as e:
         console.log(f"Error toggling found status: {e}", style="bold red")
         return Div("Failed to update item status", cls="error-message")
@@ -534,11 +937,15 @@ def toggle_found(item_id: int):
 def remove_item(item_id: int):
     """Remove an item from the list."""
     try:
-        with get_db_connection() as conn:
-            conn.execute("DELETE FROM shopping_list WHERE id = ?", (item_id,))
-            conn.commit()
-            
-        return ShoppingContainer(fetch_shopping_list())
+        removed = submit_write(SQL_DELETE_ITEM, (item_id,), on_commit=patch_removed_rows).result()
+        if not removed:
+            return []
+
+        categories = fetch_shopping_list()
+        if removed[0]['category'] not in categories:
+            # Last item of its category: redraw the list to drop the section
+            return [ShoppingContainer(categories, oob=True), BudgetCardOOB()]
+        return [Div(id=f"item-{item_id}", hx_swap_oob="delete"), BudgetCardOOB()]
     except sqlite3.Error as e:
         console.log(f"Error removing item: {e}", style="bold red")
         return Div("Failed to remove item", cls="error-message")
@@ -546,23 +953,24 @@ def remove_item(item_id: int):
 @app.get("/edit/{item_id}/{field}")
 def edit_form(item_id: int, field: str):
     """Return an edit form for the specified field."""
+    sql = SQL_SELECT_FIELD.get(field)
+    if sql is None:
+        return Div("Invalid field", cls="error-message")
+
     input_type = "number" if field in ["quantity", "cost"] else "text"
     step = "0.01" if field == "cost" else "1" if field == "quantity" else None
     min_value = "0" if field in ["quantity", "cost"] else None
     
     try:
         with get_db_connection() as conn:
-            result = conn.execute(
-                f"SELECT {field} FROM shopping_list WHERE id = ?",
-                (item_id,)
-            ).fetchone()
+            result = conn.execute(sql, (item_id,)).fetchone()
             
             if not result:
                 return Div("Item not found", cls="error-message")
             
-            value = result[field]
-            if field == "cost" and isinstance(value, str) and value.startswith("$"):
-                value = value[1:]
+            value = result[0]
+            if field == "cost":
+                value = format_cents(value)
 
             return Form(
                 Input(
@@ -586,6 +994,10 @@ def edit_form(item_id: int, field: str):
 @app.post("/update/{item_id}/{field}")
 def update_field(item_id: int, field: str, value: str):
     """Update a single field with validation."""
+    sql = SQL_UPDATE_FIELD.get(field)
+    if sql is None:
+        return Div("Invalid field", cls="error-message")
+
     try:
         # Input validation
         if not value.strip():
@@ -595,9 +1007,11 @@ def update_field(item_id: int, field: str, value: str):
         if field in ["quantity", "cost"]:
             try:
                 if field == "cost":
-                    value = float(value.replace("$", "").strip())
+                    value = _parse_money(value)
                 else:
                     value = int(value)
+                    if value > MAX_QUANTITY:
+                        raise ValueError(f"Quantity out of range: {value}")
                 
                 if value < 0:
                     return Div(f"{field.title()} cannot be negative", cls="error-message")
@@ -605,15 +1019,13 @@ def update_field(item_id: int, field: str, value: str):
                 return Div(f"Invalid {field} format", cls="error-message")
         
         # Update database
-        with get_db_connection() as conn:
-            conn.execute(
-                f"UPDATE shopping_list SET {field} = ? WHERE id = ?",
-                (value, item_id)
-            )
-            conn.commit()
-            
-            # Return full container to update totals
-            return ShoppingContainer(fetch_shopping_list())
+        updated = submit_write(sql, (value, item_id), on_commit=patch_updated_rows).result()
+
+        if field == "category":
+            # The card moves to another section, so redraw the whole list
+            return [ShoppingContainer(fetch_shopping_list(), oob=True), BudgetCardOOB()]
+        # Re-render the edited card and refresh totals
+        return [*(NotStr(_render_item(row, oob=True)) for row in updated), BudgetCardOOB()]
             
     except sqlite3.Error as e:
         console.log(f"Error updating field: {e}", style="bold red")
@@ -621,7 +1033,7 @@ def update_field(item_id: int, field: str, value: str):
 def populate_sample_data():
     """Populate the database with all painting supplies using correct store information."""
     try:
-        conn = sqlite3.connect(DATABASE)
+        conn = open_connection()
         c = conn.cursor()
 
         # Complete list of items with correct stores and prices
@@ -670,21 +1082,28 @@ def populate_sample_data():
             ("Tools", "Light extension cord", 2, 15.00, "For sprayer", 0, "Walmart")
         ]
 
+        # Clear and reload in one transaction so the WAL is flushed once
+        c.execute("BEGIN IMMEDIATE")
+
         # Clear existing items (optional - remove if you want to preserve existing items)
         c.execute("DELETE FROM shopping_list")
 
-        # Insert all items
+        # Insert all items, with prices converted to cents
         c.executemany("""
-            INSERT INTO shopping_list (category, item, quantity, cost, notes, found, store)
+            INSERT INTO shopping_list (category, item, quantity, cost_cents, notes, found, store)
             VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, items)
+        """, [
+            (category, item, quantity, to_cents(cost), notes, found, store)
+            for category, item, quantity, cost, notes, found, store in items
+        ])
 
-        conn.commit()
+        c.execute("COMMIT")
         conn.close()
-        print("Database populated successfully with all painting supplies.")
+        invalidate_shopping_list()
+        console.print("Database populated successfully with all painting supplies.")
         
     except sqlite3.Error as e:
-        print(f"Database error: {e}")
+        console.print(f"Database error: {e}")
         raise
 
 
@@ -693,6 +1112,10 @@ def populate_sample_data():
 
 
 if __name__ == "__main__":
+    # Enable Rich traceback for debugging
+    from rich.traceback import install
+    install()
+
     # Ensure data directory exists
     DATA_PATH.mkdir(parents=True, exist_ok=True)
     
@@ -0,0 +1,54 @@
+import pytest
+
+from main import MAX_CENTS, MAX_QUANTITY, _parse_money, parse_item_lines
+
+
+@pytest.mark.parametrize("text, cents", [
+    ("12", 1200),
+    ("12.5", 1250),
+    ("12.50", 1250),
+    ("$12.05", 1205),
+    (" $7 ", 700),
+    ("5.", 500),
+    (".5", 50),
+    ("-3.25", -325),
+    ("$-3.25", -325),
+    ("1000000000", MAX_CENTS),
+])
+def test_parse_money(text, cents):
+    assert _parse_money(text) == cents
+
+
+@pytest.mark.parametrize("text", [
+    "", "$", ".", "-", "abc", "12.345", "1e3", "1,000", "--5", "12.5.0",
+    "inf", "nan", "1000000000.01", "100000000000000000000",
+])
+def test_parse_money_rejects(text):
+    with pytest.raises(ValueError):
+        _parse_money(text)
+
+
+def test_parse_item_lines():
+    items = parse_item_lines(
+        "Paint,Primer,2,$30.50,Lowe's,Two coats\n"
+        "\n"
+        'Tools,"Ladder, tall",1,150,Home Depot\n'
+    )
+    assert [(i.category, i.item, i.quantity, i.cost_cents, i.store, i.notes) for i in items] == [
+        ("Paint", "Primer", 2, 3050, "Lowe's", "Two coats"),
+        ("Tools", "Ladder, tall", 1, 15000, "Home Depot", None),
+    ]
+
+
+@pytest.mark.parametrize("text, message", [
+    ("", "No items to add"),
+    ("Paint,Primer,2,30", "Line 1: expected"),
+    ("Paint,Primer,2,30,Lowe's\nPaint,Tape,x,5,Walmart", "Line 2: invalid"),
+    ("Paint,Primer,-1,30,Lowe's", "Line 1: invalid"),
+    ("Paint,Primer,2,inf,Lowe's", "Line 1: invalid"),
+    ("Paint,Primer,2,1e20,Lowe's", "Line 1: invalid"),
+    (f"Paint,Primer,{MAX_QUANTITY + 1},30,Lowe's", "Line 1: invalid"),
+])
+def test_parse_item_lines_rejects(text, message):
+    with pytest.raises(ValueError, match=message):
+        parse_item_lines(text)